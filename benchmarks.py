@@ -0,0 +1,352 @@
+import asyncio  # Import the asyncio module to drive the service load test
+import contextlib  # Import the contextlib module to redirect printed output
+import io  # Import the io module for in-memory output
+import json  # Import the json module to encode service requests
+import os  # Import the os module to manage temporary files
+import random  # Import the random module to generate synthetic rosters
+import sys  # Import the sys module to read command-line arguments
+import tempfile  # Import the tempfile module for scratch directories
+import time  # Import the time module to measure elapsed time
+import tracemalloc  # Import the tracemalloc module to measure peak memory
+from decimal import Decimal  # Import the Decimal class from the decimal module
+
+import empman  # Import the employee management program
+
+# Function to build a reproducible synthetic roster
+def make_roster(size, seed=0):
+    rng = random.Random(seed)  # Use a seeded generator so every run sees the same roster
+    roster = []
+    for i in range(size):
+        id = f"{i:07d}"  # Zero-padded IDs like the ones entered in the CLI
+        if i % 3:
+            salary = Decimal(rng.randint(3000000, 15000000)) / 100  # Salary between 30,000.00 and 150,000.00
+            benefits = Decimal(rng.randint(0, 20000)) / 100  # Weekly benefits between 0.00 and 200.00
+            tax_rate = Decimal(rng.randint(500, 3500)) / 100  # Tax rate between 5.00% and 35.00%
+            roster.append(empman.FullTimeEmployee("full-time", f"Employee {i}", id, salary, benefits, tax_rate))
+        else:
+            hourly_rate = Decimal(rng.randint(1200, 6000)) / 100  # Hourly rate between 12.00 and 60.00
+            hours_worked = Decimal(rng.randint(0, 400)) / 10  # Hours worked between 0.0 and 40.0
+            tax_rate = Decimal(rng.randint(500, 3500)) / 100  # Tax rate between 5.00% and 35.00%
+            roster.append(empman.PartTimeEmployee("part-time", f"Employee {i}", id, hourly_rate, hours_worked, tax_rate))
+    return roster
+
+# Function to time a callable and return (seconds, result)
+def timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return time.perf_counter() - start, result
+
+# Function to compute pay one object at a time, the way display_employees does
+def per_object_payroll(roster):
+    return [emp.calculate_weekly_pay() if isinstance(emp, empman.FullTimeEmployee) else emp.calculate_pay() for emp in roster]
+
+# Benchmark: per-object pay strings versus the batch payroll engine
+def bench_payroll(size=100000):
+    roster = make_roster(size)
+    loop_seconds, strings = timed(per_object_payroll, roster)
+    batch_seconds, columns = timed(empman.run_payroll, roster)
+    for emp, text, gross, net in zip(roster, strings, columns["gross"], columns["net"]):
+        if isinstance(emp, empman.FullTimeEmployee):
+            expected_gross = text.split(", Weekly Net Pay: ")[0].removeprefix("Weekly Gross Pay: ")
+        else:
+            expected_gross = f"{emp.pay_amounts()[0]:,.2f}"  # calculate_pay shows part-time gross unrounded
+        if f"{gross:,.2f}" != expected_gross or not text.endswith(f"Net Pay: {net:,.2f}"):
+            raise RuntimeError(f"Pay mismatch for ID {emp.id}: {text!r} vs gross {gross}, net {net}")  # Batch results must be penny-identical
+    print(f"payroll: {size:,} employees")
+    print(f"  per-object loop: {loop_seconds:.3f}s")
+    print(f"  run_payroll:     {batch_seconds:.3f}s ({loop_seconds / batch_seconds:.1f}x)")
+
+# Benchmark: startup time of a registry backed by a large on-disk store
+def bench_startup(size=1000000):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "employees.db")
+        store = empman.EmployeeStore(path)
+        save_seconds, _ = timed(store.save_many, make_roster(size))
+        store.close()
+
+        def open_registry():
+            registry = empman.EmployeeRegistry(empman.EmployeeStore(path))
+            registry.get(f"{size // 2:07d}")  # First lookup right after startup
+            return registry
+
+        startup_seconds, registry = timed(open_registry)
+        update_seconds, _ = timed(registry.update, f"{size // 3:07d}", tax_rate="20")
+        load_seconds, _ = timed(registry._load)
+        print(f"startup: {size:,} employees ({os.path.getsize(path) / 1e6:.0f} MB on disk)")
+        print(f"  bulk save:              {save_seconds:.3f}s")
+        print(f"  open + first lookup:    {startup_seconds * 1000:.2f}ms")
+        print(f"  single update on disk:  {update_seconds * 1000:.2f}ms")
+        print(f"  full roster load:       {load_seconds:.3f}s")
+        registry._store.close()
+
+# The original log_action: open, append one line and close for every action
+def unbuffered_log_action(path, action, emp):
+    with open(path, "a") as log_file:
+        log_file.write(f"{empman.datetime.datetime.now()} - {action} - {emp.get_employee_details()}\n")
+
+# Benchmark: throughput of the per-action open/append/close path versus the batched AuditLog
+def bench_audit_log(size=1000000):
+    roster = make_roster(1000)
+    with tempfile.TemporaryDirectory() as tmp:
+        old_path = os.path.join(tmp, "old_log.txt")
+
+        def old_run():
+            for i in range(size):
+                unbuffered_log_action(old_path, "Updated", roster[i % len(roster)])
+
+        def new_run():
+            log = empman.AuditLog(os.path.join(tmp, "new_log.txt"))
+            for i in range(size):
+                log.write("Updated", roster[i % len(roster)])
+            enqueue_seconds = time.perf_counter() - start
+            log.close()  # Includes draining the queue and the final fsync
+            return enqueue_seconds
+
+        old_seconds, _ = timed(old_run)
+        start = time.perf_counter()
+        new_seconds, enqueue_seconds = timed(new_run)
+        parse_seconds, entries = timed(lambda: sum(1 for _ in empman.read_log(os.path.join(tmp, "new_log.txt"))))
+        assert entries == size
+        print(f"audit_log: {size:,} actions")
+        print(f"  open/append/close per action: {old_seconds:.3f}s ({size / old_seconds:,.0f}/s)")
+        print(f"  AuditLog, caller time:        {enqueue_seconds:.3f}s ({size / enqueue_seconds:,.0f}/s)")
+        print(f"  AuditLog, until on disk:      {new_seconds:.3f}s ({size / new_seconds:,.0f}/s)")
+        print(f"  parse back with read_log:     {parse_seconds:.3f}s")
+
+# Benchmark: peak memory of a streaming CSV import and export at growing file sizes
+def bench_import(sizes=(10000, 40000, 160000)):
+    print("import/export: store-backed registry, peak traced memory")
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            csv_path = os.path.join(tmp, "staff.csv")
+            source = empman.EmployeeRegistry()
+            source.add_many(make_roster(size))
+            empman.export_employees(csv_path, source)
+            del source  # Only the file on disk feeds the import
+            registry = empman.EmployeeRegistry(empman.EmployeeStore(os.path.join(tmp, "employees.db")))
+            saved_log, empman.audit_log = empman.audit_log, empman.AuditLog(os.path.join(tmp, "employee_log.txt"))
+            try:
+                tracemalloc.start()
+                import_seconds, result = timed(empman.import_employees, csv_path, registry)
+                import_peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.reset_peak()
+                export_seconds, _ = timed(empman.export_employees, os.path.join(tmp, "out.jsonl"), registry)
+                export_peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+            finally:
+                empman.audit_log.close()
+                empman.audit_log = saved_log
+                registry._store.close()
+            assert result == {"imported": size, "rejected": 0}
+            print(f"  {size:>7,} rows: import {import_seconds:.2f}s peak {import_peak / 1e6:.1f} MB, "
+                  f"export {export_seconds:.2f}s peak {export_peak / 1e6:.1f} MB")
+
+# The original employee classes: a per-instance __dict__ and a fresh Decimal for every field
+class LegacyFullTimeEmployee:
+    def __init__(self, role, name, id, salary, benefits, tax_rate):
+        self.role, self.name, self.id = role, name, id
+        self.salary, self.benefits, self.tax_rate = Decimal(salary), Decimal(benefits), Decimal(tax_rate)
+
+class LegacyPartTimeEmployee:
+    def __init__(self, role, name, id, hourly_rate, hours_worked, tax_rate):
+        self.role, self.name, self.id = role, name, id
+        self.hourly_rate, self.hours_worked, self.tax_rate = Decimal(hourly_rate), Decimal(hours_worked), Decimal(tax_rate)
+
+# Function to build a roster from text fields, the way the CLI, the store and the importer do
+def build_roster(size, full_time_cls, part_time_cls, cents=False):
+    rng = random.Random(0)
+    roster = []
+    for i in range(size):
+        role = ("full" if i % 3 else "part") + "-time"  # A new string per record, like input() returns
+        if cents:
+            # Cent-level amounts as in make_roster: nearly every salary, benefit and rate is distinct
+            if i % 3:
+                roster.append(full_time_cls(role, f"Employee {i}", f"{i:07d}", f"{rng.randint(3000000, 15000000) / 100:.2f}", f"{rng.randint(0, 20000) / 100:.2f}", f"{rng.randint(500, 3500) / 100:.2f}"))
+            else:
+                roster.append(part_time_cls(role, f"Employee {i}", f"{i:07d}", f"{rng.randint(1200, 6000) / 100:.2f}", f"{rng.randint(0, 400) / 10:.1f}", f"{rng.randint(500, 3500) / 100:.2f}"))
+        elif i % 3:
+            roster.append(full_time_cls(role, f"Employee {i}", f"{i:07d}", str(rng.randint(30, 150) * 1000), str(rng.randint(0, 8) * 25), str(rng.randint(10, 35))))
+        else:
+            roster.append(part_time_cls(role, f"Employee {i}", f"{i:07d}", f"{rng.randint(12, 60)}.50", str(rng.randint(0, 40)), str(rng.randint(10, 35))))
+    return roster
+
+# Benchmark: memory per employee for the original classes versus the compact ones
+def bench_memory(size=200000):
+    print(f"memory: {size:,} employees (name and ID strings included)")
+    for values, cents in (("round amounts, few distinct values", False), ("cent-level amounts, mostly distinct", True)):
+        print(f"  {values}:")  # Shared Decimals only pay off when values repeat, so report both distributions
+        for label, full_time_cls, part_time_cls in (("dict-based classes", LegacyFullTimeEmployee, LegacyPartTimeEmployee),
+                                                     ("__slots__ classes ", empman.FullTimeEmployee, empman.PartTimeEmployee)):
+            empman._cached_decimal.cache_clear()
+            tracemalloc.start()
+            seconds, roster = timed(build_roster, size, full_time_cls, part_time_cls, cents=cents)
+            used = tracemalloc.get_traced_memory()[0]
+            tracemalloc.stop()
+            print(f"    {label}: {used / size:.0f} bytes/employee (built in {seconds:.2f}s)")
+            del roster
+
+# The original display loop: recompute pay and print every line separately
+def legacy_display(roster):
+    for emp in roster:
+        print("-----------------------------")
+        print(emp.get_employee_details())
+        if isinstance(emp, empman.FullTimeEmployee):
+            print(emp.get_salary())
+            print(emp.calculate_weekly_pay())
+        elif isinstance(emp, empman.PartTimeEmployee):
+            print(emp.calculate_pay())
+
+# Benchmark: repeated full displays with per-line prints versus paged writes with memoized pay
+def bench_display(size=100000, page_size=50):
+    roster = make_roster(size)
+    saved, empman.employees = empman.employees, empman.EmployeeRegistry()
+    try:
+        empman.employees.add_many(roster)
+        with contextlib.redirect_stdout(io.StringIO()):
+            legacy_seconds, _ = timed(legacy_display, roster)
+        render = lambda: sum(1 for _ in empman.employee_pages(page_size=page_size))
+        first_seconds, pages = timed(render)
+        second_seconds, _ = timed(render)
+        for emp in roster[::10]:
+            empman.employees.update(emp.id, tax_rate="25")  # Change 10% of the roster
+        after_update_seconds, _ = timed(render)
+        page_seconds, _ = timed(lambda: next(empman.employee_pages(role="part-time", id_range=("0050000", "0060000"), page_size=page_size)))
+    finally:
+        empman.employees = saved
+    print(f"display: {size:,} employees, {pages:,} pages of {page_size}")
+    print(f"  print per line, recompute pay:  {legacy_seconds:.3f}s")
+    print(f"  paged, first render:            {first_seconds:.3f}s")
+    print(f"  paged, memoized render:         {second_seconds:.3f}s")
+    print(f"  paged, after updating 10%:      {after_update_seconds:.3f}s")
+    print(f"  one filtered page:              {page_seconds * 1000:.2f}ms")
+
+# Benchmark: history lookups by full scan versus the sidecar log index
+def bench_log_query(size=2000000):
+    roster = make_roster(10000)
+    start_time = empman.datetime.datetime(2026, 1, 1)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "employee_log.txt")
+        with open(path, "w") as log_file:
+            for i in range(size):
+                timestamp = start_time + empman.datetime.timedelta(seconds=i * 10)
+                log_file.write(empman.AuditLog.format_line(timestamp, "Updated" if i % 4 else "Added", roster[i % len(roster)]))
+        target = roster[999].id
+        window = (start_time + empman.datetime.timedelta(days=30), start_time + empman.datetime.timedelta(days=31))
+
+        def scan():
+            return [e for e in empman.read_log(path) if e["id"] == target and window[0] <= e["timestamp"] <= window[1]]
+
+        scan_seconds, expected = timed(scan)
+        index = empman.LogIndex(path)
+        build_seconds, _ = timed(index.refresh)
+        query_seconds, found = timed(lambda: list(index.query(target, *window)))
+        id_seconds, by_id = timed(lambda: list(index.query(target)))
+        assert found == expected
+        with open(path, "a") as log_file:
+            for i in range(1000):
+                log_file.write(empman.AuditLog.format_line(start_time, "Updated", roster[i]))
+        refresh_seconds, added = timed(index.refresh)
+        index.close()
+        print(f"log_query: {size:,} lines ({os.path.getsize(path) / 1e6:.0f} MB)")
+        print(f"  full scan, one ID + 1 day:       {scan_seconds:.3f}s")
+        print(f"  initial index build:             {build_seconds:.3f}s")
+        print(f"  indexed, one ID + 1 day:         {query_seconds * 1000:.2f}ms ({len(found)} entries)")
+        print(f"  indexed, one ID, all time:       {id_seconds * 1000:.2f}ms ({len(by_id)} entries)")
+        print(f"  incremental refresh, {added} lines: {refresh_seconds * 1000:.2f}ms")
+
+# Benchmark: year-long payroll projection with one worker versus a process pool
+def bench_projection(size=20000, worker_counts=(1, 2, 4)):
+    roster = make_roster(size)
+    scenarios = [
+        empman.Scenario("baseline"),
+        empman.Scenario("raise 3% from Q3", raise_pct=3, raise_period=26),
+        empman.Scenario("tax +2pt, hours +/-20%", tax_rate_change=2, hours_spread="0.2", seed=7),
+    ]
+    print(f"projection: {size:,} employees x {len(scenarios)} scenarios x {empman.WEEKS_PER_YEAR} periods ({os.cpu_count()} CPUs)")
+    reference = None
+    for workers in worker_counts:
+        seconds, results = timed(empman.project_payroll, roster, scenarios, workers=workers, shard_size=2000)
+        if reference is None:
+            reference = results
+        assert results == reference, "projection must not depend on the worker count"
+        print(f"  {workers} worker(s): {seconds:.3f}s")
+    for name, by_role in reference.items():
+        year = sum(net for per_period in by_role.values() for _, net in per_period)
+        print(f"  {name}: yearly net {year:,.2f}")
+
+# Function to run one load-test client: a connection sending a series of requests and timing each response
+async def service_client(port, client, requests, roster, hot_ids, latencies):
+    rng = random.Random(client)
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    failures = 0
+    for _ in range(requests):
+        choice = rng.random()
+        if choice < 0.25:
+            request = {"op": "update", "id": rng.choice(hot_ids), "changes": {"tax_rate": str(rng.randint(10, 35))}}
+        elif choice < 0.45:
+            request = {"op": "pay", "id": rng.choice(roster).id}
+        elif choice < 0.50:
+            request = {"op": "list", "role": "part-time", "offset": rng.randint(0, 100), "limit": 20}
+        else:
+            request = {"op": "get", "id": rng.choice(roster).id}
+        start = time.perf_counter()
+        writer.write(json.dumps(request).encode() + b"\n")
+        await writer.drain()
+        response = json.loads(await reader.readline())
+        latencies.append(time.perf_counter() - start)
+        failures += not response["ok"]
+    writer.close()
+    await writer.wait_closed()
+    return failures
+
+# Benchmark: p50/p99 latency of the service under many concurrent clients
+def bench_service(clients=1000, requests_per_client=10, size=20000):
+    roster = make_roster(size)
+    hot_ids = [emp.id for emp in roster[:50]]  # Updates concentrate on a few employees to exercise the per-employee locks
+    with tempfile.TemporaryDirectory() as tmp:
+        registry = empman.EmployeeRegistry(empman.EmployeeStore(os.path.join(tmp, "employees.db")))
+        registry.add_many(roster)
+        saved_log, empman.audit_log = empman.audit_log, empman.AuditLog(os.path.join(tmp, "employee_log.txt"))
+
+        async def run():
+            service = await empman.EmployeeService(registry, port=0).start()
+            latencies = []
+            start = time.perf_counter()
+            failures = await asyncio.gather(*(service_client(service.port, c, requests_per_client, roster, hot_ids, latencies) for c in range(clients)))
+            elapsed = time.perf_counter() - start
+            await service.close()
+            return latencies, sum(failures), elapsed
+
+        try:
+            latencies, failures, elapsed = asyncio.run(run())
+            empman.audit_log.flush()
+            updates = sum(1 for e in empman.read_log(empman.audit_log.path) if e["action"] == "Updated")
+            for id in hot_ids:
+                on_disk = registry._store.get(id)
+                assert on_disk.tax_rate == registry.get(id).tax_rate, f"store and memory disagree for {id}"
+        finally:
+            empman.audit_log.close()
+            empman.audit_log = saved_log
+            registry._store.close()
+    latencies.sort()
+    total = len(latencies)
+    print(f"service: {clients:,} concurrent clients x {requests_per_client} requests ({total:,} total, {updates:,} updates)")
+    print(f"  throughput: {total / elapsed:,.0f} requests/s, failures: {failures}")
+    print(f"  p50: {latencies[total // 2] * 1000:.2f}ms  p99: {latencies[int(total * 0.99)] * 1000:.2f}ms  max: {latencies[-1] * 1000:.2f}ms")
+
+BENCHMARKS = {
+    "payroll": bench_payroll,
+    "startup": bench_startup,
+    "audit_log": bench_audit_log,
+    "import": bench_import,
+    "memory": bench_memory,
+    "display": bench_display,
+    "log_query": bench_log_query,
+    "projection": bench_projection,
+    "service": bench_service,
+}
+
+if __name__ == "__main__":
+    names = sys.argv[1:] or list(BENCHMARKS)  # Run the named benchmarks, or all of them
+    for name in names:
+        BENCHMARKS[name]()
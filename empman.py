@@ -1,74 +1,737 @@
-from decimal import Decimal, InvalidOperation  # Import Decimal and InvalidOperation classes from the decimal module
+from decimal import MAX_EMAX, MAX_PREC, MIN_EMIN, Decimal, InvalidOperation, localcontext  # Import Decimal, InvalidOperation, localcontext and context limits from the decimal module
+import asyncio  # Import the asyncio module for the service mode
+import atexit  # Import the atexit module to flush the audit log on exit
+import concurrent.futures  # Import concurrent.futures for the payroll projection process pool
+import csv  # Import the csv module for bulk import/export
 import datetime  # Import the datetime module
+import json  # Import the json module for bulk import/export
+import os  # Import the os module for fsync and log rotation
+import queue  # Import the queue module to hand log lines to the writer thread
+import random  # Import the random module for seeded hours distributions in projections
+import sqlite3  # Import the sqlite3 module for the on-disk employee store
+import sys  # Import the sys module for command-line arguments and error output
+import threading  # Import the threading module for the background log writer
+import time  # Import the time module to pace log flushes
+import weakref  # Import the weakref module so unused per-employee locks are released
+from functools import lru_cache  # Import lru_cache to share repeated Decimal values
+from itertools import islice  # Import islice to process rosters in chunks
+from operator import attrgetter  # Import attrgetter to read several attributes in one call
+
+CENTS = Decimal("0.01")  # Quantum used to round money to whole cents
+WEEKS_PER_YEAR = 52  # Number of pay weeks in a year for salaried employees
+
+# Pay formulas shared by the employee classes and the batch payroll engine
+def weekly_pay_formula(salary, benefits, tax_rate):
+    gross = (salary / WEEKS_PER_YEAR) - benefits  # Weekly gross pay is salary spread over the year less benefits
+    return gross, gross * (1 - tax_rate / 100)  # Weekly net pay after tax
+
+def period_pay_formula(hourly_rate, hours_worked, tax_rate):
+    gross = hourly_rate * hours_worked  # Gross pay for the pay period
+    return gross, gross * (1 - tax_rate / 100)  # Net pay after tax
+
+# Function to convert a value to a Decimal, reusing one immutable object for values that repeat across the roster
+@lru_cache(maxsize=4096)
+def _cached_decimal(text):
+    return Decimal(text)
+
+def shared_decimal(value):
+    if isinstance(value, float):
+        return Decimal(value)  # Keep the exact binary value of floats, as Decimal() does
+    return _cached_decimal(str(value))  # Key by text so "10" and "10.00" stay distinct
 
 # Base class for all employees
 class Employee:
+    __slots__ = ("role", "name", "id", "_pay_text")  # No per-instance __dict__; keeps large rosters compact
+
     def __init__(self, role, name, id):
-        self.role = role  # Employee role (full-time or part-time)
+        self.role = sys.intern(role)  # Employee role (full-time or part-time); interned so all employees share one string
         self.name = name  # Employee name
         self.id = id      # Employee ID number
+        self._pay_text = None  # Memoized pay lines for display; reset whenever pay fields change
 
     def get_employee_details(self):
         return f"Role: {self.role}, Name: {self.name}, ID: {self.id}"  # Return a formatted string with employee details
 
+    def _format_pay(self):
+        return ""  # Plain employees have no pay details
+
+    def pay_text(self):
+        if self._pay_text is None:
+            self._pay_text = self._format_pay()  # Compute and format pay only when it is first needed after a change
+        return self._pay_text
+
 # Derived class for full-time employees
 class FullTimeEmployee(Employee):
+    __slots__ = ("salary", "benefits", "tax_rate")
+
     def __init__(self, role, name, id, salary, benefits, tax_rate):
         super().__init__(role, name, id)  # Call the constructor of the base class Employee
-        self.salary = Decimal(salary)  # Set salary as a Decimal object
-        self.benefits = Decimal(benefits)  # Set benefits as a Decimal object
-        self.tax_rate = Decimal(tax_rate)  # Set tax rate as a Decimal object
+        self.salary = shared_decimal(salary)  # Set salary as a Decimal object
+        self.benefits = shared_decimal(benefits)  # Set benefits as a Decimal object
+        self.tax_rate = shared_decimal(tax_rate)  # Set tax rate as a Decimal object
 
     def get_salary(self):
         return f"Salary: {self.salary:,.2f}, Benefits: {self.benefits}, Tax Rate: {self.tax_rate}"  # Return a formatted string with salary, benefits, and tax rate
 
+    def weekly_pay_amounts(self):
+        return weekly_pay_formula(self.salary, self.benefits, self.tax_rate)  # Return unrounded (gross, net) Decimals
+
     def calculate_weekly_pay(self):
-        weekly_gross_pay = (self.salary / 52) - self.benefits  # Calculate weekly gross pay
-        weekly_net_pay = weekly_gross_pay * (1 - self.tax_rate / 100)  # Calculate weekly net pay after tax
+        weekly_gross_pay, weekly_net_pay = self.weekly_pay_amounts()  # Calculate weekly gross and net pay
         return f"Weekly Gross Pay: {weekly_gross_pay:,.2f}, Weekly Net Pay: {weekly_net_pay:,.2f}"  # Return a formatted string with weekly gross and net pay
 
+    def _format_pay(self):
+        return self.get_salary() + "\n" + self.calculate_weekly_pay() + "\n"  # Salary and weekly pay lines
+
     def update_details(self, salary=None, benefits=None, tax_rate=None):
+        self._pay_text = None  # Invalidate the memoized pay lines
         if salary:
-            self.salary = Decimal(salary)  # Update salary if a new value is provided
+            self.salary = shared_decimal(salary)  # Update salary if a new value is provided
         if benefits:
-            self.benefits = Decimal(benefits)  # Update benefits if a new value is provided
+            self.benefits = shared_decimal(benefits)  # Update benefits if a new value is provided
         if tax_rate:
-            self.tax_rate = Decimal(tax_rate)  # Update tax rate if a new value is provided
+            self.tax_rate = shared_decimal(tax_rate)  # Update tax rate if a new value is provided
 
 # Derived class for part-time employees
 class PartTimeEmployee(Employee):
+    __slots__ = ("hourly_rate", "hours_worked", "tax_rate")
+
     def __init__(self, role, name, id, hourly_rate, hours_worked, tax_rate):
         super().__init__(role, name, id)  # Call the constructor of the base class Employee
-        self.hourly_rate = Decimal(hourly_rate)  # Set hourly rate as a Decimal object
-        self.hours_worked = Decimal(hours_worked)  # Set hours worked as a Decimal object
-        self.tax_rate = Decimal(tax_rate)  # Set tax rate as a Decimal object
+        self.hourly_rate = shared_decimal(hourly_rate)  # Set hourly rate as a Decimal object
+        self.hours_worked = shared_decimal(hours_worked)  # Set hours worked as a Decimal object
+        self.tax_rate = shared_decimal(tax_rate)  # Set tax rate as a Decimal object
+
+    def pay_amounts(self):
+        return period_pay_formula(self.hourly_rate, self.hours_worked, self.tax_rate)  # Return unrounded (gross, net) Decimals
 
     def calculate_pay(self):
-        gross_pay = self.hourly_rate * self.hours_worked  # Calculate gross pay
-        net_pay = gross_pay * (1 - self.tax_rate / 100)  # Calculate net pay after tax
+        gross_pay, net_pay = self.pay_amounts()  # Calculate gross and net pay
         return f"Hourly Rate: {self.hourly_rate}, Hours Worked: {self.hours_worked}, Gross Pay: {gross_pay}, Net Pay: {net_pay:,.2f}"  # Return a formatted string with hourly rate, hours worked, gross pay, and net pay
 
+    def _format_pay(self):
+        return self.calculate_pay() + "\n"  # Pay line
+
     def update_details(self, hourly_rate=None, hours_worked=None, tax_rate=None):
+        self._pay_text = None  # Invalidate the memoized pay lines
         if hourly_rate:
-            self.hourly_rate = Decimal(hourly_rate)  # Update hourly rate if a new value is provided
+            self.hourly_rate = shared_decimal(hourly_rate)  # Update hourly rate if a new value is provided
         if hours_worked:
-            self.hours_worked = Decimal(hours_worked)  # Update hours worked if a new value is provided
+            self.hours_worked = shared_decimal(hours_worked)  # Update hours worked if a new value is provided
         if tax_rate:
-            self.tax_rate = Decimal(tax_rate)  # Update tax rate if a new value is provided
+            self.tax_rate = shared_decimal(tax_rate)  # Update tax rate if a new value is provided
+
+# On-disk employee store backed by SQLite; every change is written as a single-row statement
+class EmployeeStore:
+    COLUMNS = ("id", "role", "name", "salary", "benefits", "hourly_rate", "hours_worked", "tax_rate")
+
+    def __init__(self, path="employees.db"):
+        self.path = path
+        self.conn = sqlite3.connect(path, check_same_thread=False)  # Open (or create) the database file; callers serialize access (see EmployeeService)
+        self.conn.execute("PRAGMA journal_mode=WAL")  # Append changes to a write-ahead log instead of rewriting pages in place
+        self.conn.execute("PRAGMA synchronous=NORMAL")  # WAL mode stays consistent without an fsync on every commit
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS employees ("
+            "id TEXT PRIMARY KEY, role TEXT NOT NULL, name TEXT NOT NULL, "
+            "salary TEXT, benefits TEXT, hourly_rate TEXT, hours_worked TEXT, tax_rate TEXT)"
+        )  # Decimals are stored as text so they round-trip exactly
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()  # Close the database connection
+
+    @staticmethod
+    def to_row(emp):
+        key = EmployeeRegistry.normalize_id(emp.id)
+        if isinstance(emp, FullTimeEmployee):
+            return (key, emp.role, emp.name, str(emp.salary), str(emp.benefits), None, None, str(emp.tax_rate))
+        if isinstance(emp, PartTimeEmployee):
+            return (key, emp.role, emp.name, None, None, str(emp.hourly_rate), str(emp.hours_worked), str(emp.tax_rate))
+        return (key, emp.role, emp.name, None, None, None, None, None)
+
+    @staticmethod
+    def from_row(row):
+        id, role, name, salary, benefits, hourly_rate, hours_worked, tax_rate = row
+        if salary is not None:
+            return FullTimeEmployee(role, name, id, salary, benefits, tax_rate)  # Rebuild a full-time employee
+        if hourly_rate is not None:
+            return PartTimeEmployee(role, name, id, hourly_rate, hours_worked, tax_rate)  # Rebuild a part-time employee
+        return Employee(role, name, id)
+
+    def count(self):
+        return self.conn.execute("SELECT COUNT(*) FROM employees").fetchone()[0]  # Number of stored employees
+
+    def get(self, id):
+        row = self.conn.execute("SELECT * FROM employees WHERE id = ?", (id,)).fetchone()  # Primary-key lookup
+        return None if row is None else self.from_row(row)
+
+    def load_all(self):
+        cursor = self.conn.execute("SELECT * FROM employees ORDER BY rowid")  # Insertion order
+        while True:
+            rows = cursor.fetchmany(10000)  # Stream rows in chunks instead of materializing the whole table
+            if not rows:
+                break
+            yield from map(self.from_row, rows)
+
+    def save(self, emp):
+        with self.conn:  # Commit the single-row change
+            self.conn.execute("INSERT OR REPLACE INTO employees VALUES (?, ?, ?, ?, ?, ?, ?, ?)", self.to_row(emp))
+
+    def save_many(self, emps):
+        with self.conn:  # Commit all rows in one transaction
+            self.conn.executemany("INSERT OR REPLACE INTO employees VALUES (?, ?, ?, ?, ?, ?, ?, ?)", map(self.to_row, emps))
+
+    def delete(self, id):
+        with self.conn:  # Commit the single-row delete
+            self.conn.execute("DELETE FROM employees WHERE id = ?", (id,))
+
+# Registry that stores employee objects with hash indexes for fast lookups
+class EmployeeRegistry:
+    def __init__(self, store=None):
+        self._by_id = {}    # Primary index: normalized ID -> employee (keeps insertion order)
+        self._by_role = {}  # Secondary index: lowercased role -> {normalized ID: employee}
+        self._by_name = {}  # Secondary index: lowercased name -> {normalized ID: employee}
+        self._store = store  # Optional EmployeeStore that receives every change
+        self._loaded = store is None  # With a store, the roster is only read from disk once it is needed
+
+    @staticmethod
+    def normalize_id(id):
+        return str(id).strip()  # IDs are compared as trimmed strings; leading zeros are significant
+
+    def __len__(self):
+        if not self._loaded:
+            return self._store.count()  # Count on disk without loading the roster
+        return len(self._by_id)  # Number of registered employees
+
+    def __iter__(self):
+        self._load()
+        return iter(list(self._by_id.values()))  # Iterate over a snapshot so callers may add/remove while looping
+
+    def __contains__(self, id):
+        return self.get(id) is not None  # O(1) membership test by ID
+
+    def _load(self):
+        if self._loaded:
+            return
+        cached = self._by_id  # Employees already fetched one at a time keep their identity
+        self._by_id, self._by_role, self._by_name = {}, {}, {}
+        for emp in self._store.load_all():
+            self._index(cached.get(emp.id, emp), emp.id)  # Rebuild the indexes in on-disk order; stored IDs are already normalized
+        self._loaded = True
+
+    def _index(self, emp, key=None):
+        if key is None:
+            key = self.normalize_id(emp.id)
+        self._by_id[key] = emp  # Add to the primary index
+        self._by_role.setdefault(emp.role.lower(), {})[key] = emp  # Add to the role index
+        self._by_name.setdefault(emp.name.lower(), {})[key] = emp  # Add to the name index
+
+    def add(self, emp):
+        key = self.normalize_id(emp.id)
+        if key in self:
+            raise ValueError(f"Employee ID {key} already exists")  # Reject duplicate IDs
+        self._index(emp, key)
+        if self._store is not None:
+            self._store.save(emp)  # Persist just this employee
+        return emp
+
+    def add_many(self, emps):
+        emps = list(emps)
+        keys = [self.normalize_id(emp.id) for emp in emps]
+        if len(set(keys)) != len(keys) or any(key in self for key in keys):
+            raise ValueError("Duplicate employee IDs")  # Reject the whole batch rather than saving part of it
+        if self._loaded:
+            for emp, key in zip(emps, keys):
+                self._index(emp, key)
+        if self._store is not None:
+            self._store.save_many(emps)  # One transaction per batch; not cached in memory until the roster is loaded
+        return emps
+
+    def stream(self):
+        if self._loaded:
+            yield from list(self._by_id.values())
+        else:
+            cached = self._by_id
+            for emp in self._store.load_all():
+                yield cached.get(emp.id, emp)  # Read through the store without loading the whole roster
+
+    def get(self, id):
+        key = self.normalize_id(id)
+        emp = self._by_id.get(key)
+        if emp is None and not self._loaded:
+            emp = self._store.get(key)  # Fall back to a primary-key lookup on disk
+            if emp is not None:
+                self._index(emp)  # Cache it so later lookups stay in memory
+        return emp  # Return the employee or None if the ID is unknown
+
+    def update(self, id, **changes):
+        emp = self.get(id)
+        if emp is None:
+            raise KeyError(id)  # Unknown employee ID
+        emp.update_details(**changes)  # Delegate field updates to the employee class
+        if self._store is not None:
+            self._store.save(emp)  # Persist just this employee
+        return emp
+
+    def remove(self, id):
+        key = self.normalize_id(id)
+        if self.get(key) is None:
+            raise KeyError(id)  # Unknown employee ID
+        emp = self._by_id.pop(key)
+        self._discard(self._by_role, emp.role.lower(), key)  # Drop from the role index
+        self._discard(self._by_name, emp.name.lower(), key)  # Drop from the name index
+        if self._store is not None:
+            self._store.delete(key)  # Delete just this employee on disk
+        return emp
+
+    def by_role(self, role):
+        self._load()
+        return list(self._by_role.get(role.lower(), {}).values())  # Employees with the given role
+
+    def by_name(self, name):
+        self._load()
+        return list(self._by_name.get(name.lower(), {}).values())  # Employees with the given name
+
+    @staticmethod
+    def _discard(index, value, key):
+        bucket = index.get(value)
+        if bucket is not None:
+            bucket.pop(key, None)  # Remove the employee from the bucket
+            if not bucket:
+                del index[value]  # Drop empty buckets so the index does not grow unbounded
+
+# Registry to store employee objects
+employees = EmployeeRegistry()
+
+# Function to build a context that rounds any finite amount to cents with the same rounding as the given context
+def cents_context(context):
+    context = context.copy()
+    context.prec, context.Emax, context.Emin = MAX_PREC, MAX_EMAX, MIN_EMIN  # Never too many digits for quantize, like the ",.2f" format
+    return context
+
+# Function to round an amount to cents; Infinity and NaN pass through, as the ",.2f" display format shows them
+def round_to_cents(value, context):
+    return value.quantize(CENTS, context=context) if value.is_finite() else value
+
+# Function to compute gross/net pay for a whole roster in one pass
+def run_payroll(roster):
+    ids, gross, net = [], [], []  # Output columns in roster order; pay is rounded to cents
+    full_time_fields = attrgetter("salary", "benefits", "tax_rate")  # Fetch all pay inputs with a single call
+    part_time_fields = attrgetter("hourly_rate", "hours_worked", "tax_rate")
+    after_tax = {}  # Cache of (1 - tax_rate / 100) per distinct tax rate; rosters reuse a handful of rates
+    with localcontext() as ctx:  # One shared context (a copy of the caller's, so rounding matches the per-object methods)
+        rounding = cents_context(ctx)
+        for emp in roster:
+            if isinstance(emp, FullTimeEmployee):
+                a, b, tax_rate = full_time_fields(emp)
+                g = a / WEEKS_PER_YEAR - b  # Same operations as weekly_pay_formula
+            elif isinstance(emp, PartTimeEmployee):
+                a, b, tax_rate = part_time_fields(emp)
+                g = a * b  # Same operations as period_pay_formula
+            else:
+                continue  # Plain Employee objects have no pay
+            factor = after_tax.get(tax_rate)
+            if factor is None:
+                factor = after_tax[tax_rate] = 1 - tax_rate / 100
+            ids.append(emp.id)
+            gross.append(round_to_cents(g, rounding))  # Same rounding as the ",.2f" display format
+            net.append(round_to_cents(g * factor, rounding))
+    return {"id": ids, "gross": gross, "net": net}
+
+# Budget scenario applied to every employee in a payroll projection
+class Scenario:
+    def __init__(self, name, raise_pct=0, raise_period=0, tax_rate_change=0, hours_spread=0, seed=0):
+        self.name = name  # Label used in the projection results
+        self.raise_pct = Decimal(str(raise_pct))  # Percentage raise to salary and hourly rate
+        self.raise_period = raise_period  # First period (0-based) the raise applies to
+        self.tax_rate_change = Decimal(str(tax_rate_change))  # Percentage points added to every tax rate
+        self.hours_spread = Decimal(str(hours_spread))  # Part-time hours vary by up to this fraction each period
+        if self.hours_spread < 0:
+            raise ValueError("hours_spread must not be negative")
+        self.seed = seed  # Seed for the hours distribution
+
+HOURS_STEP = Decimal("0.1")  # Projected hours are rounded to a tenth of an hour
+ZERO_HOURS = Decimal(0)  # Floor for projected hours; a Decimal so the result can still be quantized
+
+# Function to project one shard of the roster under one scenario; runs inside a worker process
+def project_shard(scenario, rows, periods):
+    totals = {}  # role -> per-period gross and net columns, summed from cent-rounded amounts so the order of addition never matters
+    with localcontext() as ctx:
+        rounding = cents_context(ctx)
+        for row in rows:
+            emp = EmployeeStore.from_row(row)
+            role = emp.role.lower()
+            if isinstance(emp, FullTimeEmployee):
+                formula, rate, other = weekly_pay_formula, emp.salary, emp.benefits
+            elif isinstance(emp, PartTimeEmployee):
+                formula, rate, other = period_pay_formula, emp.hourly_rate, emp.hours_worked
+            else:
+                continue  # Plain Employee objects have no pay
+            raised = rate * (1 + scenario.raise_pct / 100)
+            tax_rate = emp.tax_rate + scenario.tax_rate_change
+            spread = scenario.hours_spread if formula is period_pay_formula else 0
+            rng = random.Random(f"{scenario.seed}:{emp.id}") if spread else None  # Per-employee stream: independent of sharding
+            gross_totals, net_totals = totals.setdefault(role, ([Decimal(0)] * periods, [Decimal(0)] * periods))
+            last_inputs = last_pay = None
+            for period in range(periods):
+                amount = other
+                if rng is not None:
+                    amount = max(other * (1 + spread * Decimal(rng.randint(-1000, 1000)) / 1000), ZERO_HOURS).quantize(HOURS_STEP)  # Hours never go below zero
+                inputs = (raised if period >= scenario.raise_period else rate, amount)
+                if inputs != last_inputs:  # Most periods repeat the previous inputs
+                    gross, net = formula(inputs[0], inputs[1], tax_rate)
+                    last_pay = (round_to_cents(gross, rounding), round_to_cents(net, rounding))
+                    last_inputs = inputs
+                gross_totals[period] += last_pay[0]
+                net_totals[period] += last_pay[1]
+    return totals
+
+# Function to project pay for every scenario over a number of periods, sharded across a process pool
+def project_payroll(roster, scenarios, periods=WEEKS_PER_YEAR, workers=None, shard_size=5000):
+    workers = workers or os.cpu_count() or 1
+
+    def tasks():
+        roster_iter = iter(roster)
+        while True:
+            rows = [EmployeeStore.to_row(emp) for emp in islice(roster_iter, shard_size)]  # Plain tuples pickle compactly
+            if not rows:
+                break
+            for scenario in scenarios:
+                yield scenario, rows
+
+    results = {scenario.name: {} for scenario in scenarios}  # scenario -> role -> [(gross, net) for each period]
+
+    def merge(name, totals):
+        for role, (gross, net) in totals.items():
+            per_period = results[name].setdefault(role, [(Decimal(0), Decimal(0))] * periods)
+            results[name][role] = [(g + g2, n + n2) for (g, n), g2, n2 in zip(per_period, gross, net)]
+
+    if workers <= 1:
+        for scenario, rows in tasks():
+            merge(scenario.name, project_shard(scenario, rows, periods))  # No pool for a single worker
+        return results
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = {}
+        for scenario, rows in tasks():
+            if len(pending) >= workers * 2:  # Bound the number of shards held in memory at once
+                done, _ = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    merge(pending.pop(future), future.result())
+            pending[pool.submit(project_shard, scenario, rows, periods)] = scenario.name
+        for future in concurrent.futures.as_completed(pending):
+            merge(pending[future], future.result())
+    return results
+
+# Audit log that batches lines through a background writer thread holding a single file handle
+class AuditLog:
+    FSYNC_POLICIES = ("never", "flush", "close")  # When to force written lines onto the disk
+    _FIELD_CLEANUP = str.maketrans("\t\r\n", "   ")  # Tabs and newlines would break the line format
+
+    def __init__(self, path="employee_log.txt", flush_interval=1.0, batch_size=1000, fsync="close", max_bytes=0, backup_count=5, index=False):
+        if fsync not in self.FSYNC_POLICIES:
+            raise ValueError(f"fsync must be one of {self.FSYNC_POLICIES}")
+        self.path = path
+        self.flush_interval = flush_interval  # Longest time (seconds) a written line may sit in the file buffer
+        self.batch_size = batch_size  # Most lines written per batch
+        self.fsync = fsync  # "never", "flush" (after every flush) or "close" (once at shutdown)
+        self.max_bytes = max_bytes  # Rotate the file once it grows past this size; 0 disables rotation
+        self.backup_count = backup_count  # Number of rotated files (path.1 ... path.N) to keep
+        self.index = index  # Keep the LogIndex sidecar up to date after every flush
+        self._queue = queue.SimpleQueue()
+        self._thread = None  # The writer thread is started on first use
+        self._lock = threading.Lock()
+        self._error = None  # Exception that stopped the writer thread, re-raised to callers
+
+    @classmethod
+    def format_line(cls, timestamp, action, emp):
+        fields = (action, EmployeeRegistry.normalize_id(emp.id), emp.role, emp.name)
+        text = "\t".join(fields)
+        if text.count("\t") != 3 or "\n" in text or "\r" in text:
+            text = "\t".join(f.translate(cls._FIELD_CLEANUP) for f in fields)  # Only clean fields on the rare line that needs it
+        return timestamp.isoformat(" ", "microseconds") + "\t" + text + "\n"
+
+    def write(self, action, emp):
+        self._raise_error()  # Fail loudly instead of queueing lines nobody will write
+        self._start()
+        self._queue.put(self.format_line(datetime.datetime.now(), action, emp))  # Timestamp when the action happened, not when it is written
+
+    def flush(self, timeout=None):
+        self._raise_error()
+        thread = self._thread
+        if thread is not None:
+            done = threading.Event()
+            self._queue.put(done)  # The writer sets the event once everything queued before it is on file
+            deadline = None if timeout is None else time.monotonic() + timeout
+            while not done.wait(0.1):
+                if not thread.is_alive():
+                    break  # The writer stopped; nothing will set the event
+                if deadline is not None and time.monotonic() >= deadline:
+                    raise TimeoutError(f"Audit log was not flushed within {timeout} seconds")
+        self._raise_error()
+
+    def close(self, timeout=None):
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            atexit.unregister(self.close)
+            self._queue.put(None)  # Tell the writer to drain the queue and exit
+            thread.join(timeout)
+            if thread.is_alive():
+                raise TimeoutError(f"Audit log was not closed within {timeout} seconds")
+            self._raise_error()
+
+    def _raise_error(self):
+        if self._error is not None:
+            raise OSError(f"Audit log writer stopped: {self._error}") from self._error
+
+    def _start(self):
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="audit-log-writer", daemon=True)
+                    self._thread.start()
+                    atexit.register(self.close)  # Flush anything still queued when the program exits
+
+    def _run(self):
+        log_file = index = None
+        events = []
+        try:
+            log_file = open(self.path, "a", buffering=1 << 20)  # One handle with a large buffer for the writer's lifetime
+            if self.index:
+                index = LogIndex(self.path)
+            last_flush = time.monotonic()
+            running = True
+            while running:
+                batch, events = [], []
+                item = self._queue.get()  # Block until there is work
+                while True:
+                    if item is None:
+                        running = False  # Close was requested
+                    elif isinstance(item, threading.Event):
+                        events.append(item)
+                    else:
+                        batch.append(item)
+                    if len(batch) >= self.batch_size or not running:
+                        break
+                    try:
+                        item = self._queue.get_nowait()  # Drain whatever else is already waiting
+                    except queue.Empty:
+                        break
+                if batch:
+                    log_file.write("".join(batch))
+                now = time.monotonic()
+                if events or not running or self._queue.empty() or now - last_flush >= self.flush_interval:
+                    log_file.flush()  # Hand the buffer to the OS when idle, when asked, or at least every flush_interval
+                    if self.fsync == "flush":
+                        os.fsync(log_file.fileno())
+                    last_flush = now
+                    if index is not None:
+                        index = self._refresh_index(index)
+                if self.max_bytes and log_file.tell() >= self.max_bytes:
+                    old_file, log_file = log_file, None  # _rotate closes the old handle; don't close it twice if reopening fails
+                    log_file = self._rotate(old_file)
+                for event in events:
+                    event.set()  # Wake up callers waiting in flush()
+                events = []
+            log_file.flush()
+            if self.fsync != "never":
+                os.fsync(log_file.fileno())
+        except Exception as e:
+            self._error = e  # Keep the failure so write(), flush() and close() raise it instead of losing lines silently
+        finally:
+            if index is not None:
+                self._refresh_index(index)  # Index whatever the final flush wrote
+                index.close()
+            if log_file is not None:
+                try:
+                    log_file.close()
+                except OSError:
+                    pass  # Already failing; the first error is the one reported
+            for event in events:
+                event.set()  # Release callers waiting on this batch
+            while self._error is not None:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if isinstance(item, threading.Event):
+                    item.set()  # Release callers that queued a flush after the failure
 
-# List to store employee objects
-employees = []
+    @staticmethod
+    def _refresh_index(index):
+        try:
+            index.refresh()  # Index the lines just flushed
+            return index
+        except Exception:
+            index.close()  # The index is only an accelerator; LogIndex.query catches up on its own, so never let it stop logging
+            return None
+
+    def _rotate(self, log_file):
+        log_file.flush()
+        if self.fsync != "never":
+            os.fsync(log_file.fileno())
+        log_file.close()
+        for i in range(self.backup_count - 1, 0, -1):
+            if os.path.exists(f"{self.path}.{i}"):
+                os.replace(f"{self.path}.{i}", f"{self.path}.{i + 1}")  # Shift older backups up by one
+        if self.backup_count:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)  # No backups kept
+        return open(self.path, "a", buffering=1 << 20)
+
+# Function to parse a log line back into its fields; also reads the older " - " separated lines
+def parse_log_line(line):
+    line = line.rstrip("\n")
+    parts = line.split("\t")
+    if len(parts) == 5:
+        timestamp, action, id, role, name = parts
+    else:
+        timestamp, action, details = line.split(" - ", 2)  # Legacy format: "<timestamp> - <action> - Role: r, Name: n, ID: i"
+        details, id = details.rsplit(", ID: ", 1)
+        role, name = details[len("Role: "):].split(", Name: ", 1)
+    return {"timestamp": datetime.datetime.fromisoformat(timestamp), "action": action, "id": id, "role": role, "name": name}
+
+# Function to read every entry of a log file
+def read_log(path="employee_log.txt"):
+    with open(path) as log_file:
+        for line in log_file:
+            if line.strip():
+                yield parse_log_line(line)
+
+# Sidecar SQLite index over an audit log file, mapping employee IDs and timestamps to byte offsets
+class LogIndex:
+    SIGNATURE_BYTES = 256  # Leading bytes remembered to notice a rotated or rewritten log
+
+    def __init__(self, log_path="employee_log.txt", index_path=None):
+        self.log_path = log_path
+        self.index_path = index_path or log_path + ".idx"
+        self.skipped = 0  # Malformed log lines left out of the index by refresh()
+        self.conn = sqlite3.connect(self.index_path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value)")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS entries (id TEXT NOT NULL, ts TEXT NOT NULL, offset INTEGER NOT NULL)")
+        self._create_indexes()
+        self.conn.commit()
+
+    def _create_indexes(self):
+        self.conn.execute("CREATE INDEX IF NOT EXISTS entries_by_id ON entries (id, ts)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS entries_by_ts ON entries (ts)")
+
+    def close(self):
+        self.conn.close()  # Close the index database
+
+    def _meta(self, key, default=None):
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return default if row is None else row[0]
+
+    @staticmethod
+    def _timestamp_key(value):
+        # Fixed-width text with microseconds, so text order is time order; accepts datetimes, dates and ISO strings
+        if not isinstance(value, datetime.datetime):
+            if isinstance(value, datetime.date):
+                value = datetime.datetime.combine(value, datetime.time())  # A date means midnight at its start
+            else:
+                value = datetime.datetime.fromisoformat(str(value).strip())  # Raises ValueError for anything else
+        return value.isoformat(" ", "microseconds")
+
+    def _entry(self, line, offset):
+        text = line.decode("utf-8", "replace")
+        if not text.strip():
+            return None  # Blank line
+        try:
+            if text.count("\t") == 4:
+                timestamp, _, id, _ = text.split("\t", 3)  # Tab-separated format: no full parse needed
+            else:
+                entry = parse_log_line(text)  # Legacy " - " separated line
+                timestamp, id = entry["timestamp"], entry["id"]
+            return EmployeeRegistry.normalize_id(id), self._timestamp_key(timestamp), offset
+        except ValueError:
+            self.skipped += 1  # Malformed line: leave it out of the index rather than failing the refresh
+            return None
+
+    def refresh(self):
+        # Index only the bytes appended since the last refresh; rebuild if the log was rotated or rewritten
+        try:
+            log_file = open(self.log_path, "rb")
+        except FileNotFoundError:
+            return 0
+        with log_file, self.conn:
+            self.conn.execute("BEGIN IMMEDIATE")  # Take the write lock before reading the offset so two refreshers never index the same lines
+            signature = log_file.read(self.SIGNATURE_BYTES)
+            size = os.fstat(log_file.fileno()).st_size
+            offset = self._meta("offset", 0)
+            old_signature = self._meta("signature", b"")
+            common = min(len(signature), len(old_signature))
+            if size < offset or signature[:common] != old_signature[:common]:
+                self.conn.execute("DELETE FROM entries")  # The file no longer continues what was indexed
+                offset = 0
+            if offset == 0:
+                self.conn.execute("DROP INDEX IF EXISTS entries_by_id")  # Bulk load first, then build the indexes once
+                self.conn.execute("DROP INDEX IF EXISTS entries_by_ts")
+            log_file.seek(offset)
+            added, batch = 0, []
+            for line in log_file:
+                if not line.endswith(b"\n"):
+                    break  # Partial last line; the writer has not finished it yet
+                entry = self._entry(line, offset)
+                if entry is not None:
+                    batch.append(entry)
+                    if len(batch) >= 10000:
+                        self.conn.executemany("INSERT INTO entries VALUES (?, ?, ?)", batch)  # Insert in chunks to bound memory
+                        added += len(batch)
+                        batch = []
+                offset += len(line)
+            self.conn.executemany("INSERT INTO entries VALUES (?, ?, ?)", batch)
+            added += len(batch)
+            self._create_indexes()
+            self.conn.executemany("INSERT OR REPLACE INTO meta VALUES (?, ?)", (("offset", offset), ("signature", signature)))
+        return added
+
+    def query(self, id=None, start=None, end=None):
+        # Yield parsed entries for an employee ID and/or an inclusive timestamp range, oldest first
+        self.refresh()
+        clauses, params = [], []
+        if id is not None:
+            clauses.append("id = ?")
+            params.append(EmployeeRegistry.normalize_id(id))
+        if start is not None:
+            clauses.append("ts >= ?")
+            params.append(self._timestamp_key(start))
+        if end is not None:
+            clauses.append("ts <= ?")
+            params.append(self._timestamp_key(end))
+        where = " WHERE " + " AND ".join(clauses) if clauses else ""
+        offsets = self.conn.execute(f"SELECT offset FROM entries{where} ORDER BY ts, offset", params)
+        try:
+            log_file = open(self.log_path, "rb")
+        except FileNotFoundError:
+            return  # No log yet, so no history
+        with log_file:
+            for (offset,) in offsets:
+                log_file.seek(offset)  # Jump straight to the entry instead of scanning the file
+                yield parse_log_line(log_file.readline().decode("utf-8", "replace"))
+
+# Audit log shared by the menu actions
+audit_log = AuditLog("employee_log.txt", index=True)
 
 def log_action(action, emp):
-    with open("employee_log.txt", "a") as log_file:  # Open log file in append mode
-        log_file.write(f"{datetime.datetime.now()} - {action} - {emp.get_employee_details()}\n")  # Write action and employee details with timestamp to the log file
+    audit_log.write(action, emp)  # Queue the action and employee details with a timestamp for the background writer
 
 # Function to validate numeric inputs and handle errors
+def parse_decimal(text):
+    value = text.strip().replace(",", "")  # Clean the input string; Decimal accepts leading zeros, so "0" and "007" parse as-is
+    number = Decimal(value)  # Convert cleaned input to a Decimal object; raises InvalidOperation for blank or non-numeric input
+    if not number.is_finite():
+        raise InvalidOperation(f"not a finite number: {value!r}")  # Infinity and NaN are not amounts; they break payroll and export
+    return number
+
 def get_decimal_input(prompt):
     while True:
-        value = input(prompt).replace(",", "").lstrip("0")  # Prompt user for input and clean the input string
         try:
-            return Decimal(value)  # Convert cleaned input to a Decimal object
+            return parse_decimal(input(prompt))  # Prompt user for input and convert it to a Decimal object
         except InvalidOperation:
             print("Invalid input. Please enter a valid number.")  # Handle invalid input and prompt the user again
 
@@ -77,6 +740,9 @@ def add_employee():
     role = input("Enter role (full-time/part-time): ")  # Prompt user for employee role
     name = input("Enter name: ")  # Prompt user for employee name
     id = input("Enter ID: ")  # Prompt user for employee ID
+    if id in employees:
+        print("Employee ID already exists!")  # Reject duplicate IDs before asking for pay details
+        return
     
     if role.lower() == "full-time":
         salary = get_decimal_input("Enter salary: ")  # Prompt user for salary and validate input
@@ -92,56 +758,370 @@ def add_employee():
         print("Invalid role!")  # Handle invalid role input
         return
     
-    employees.append(employee)  # Add the new employee to the employees list
+    employees.add(employee)  # Add the new employee to the registry
     log_action("Added", employee)  # Log the action of adding a new employee
     print("Employee added successfully!")  # Inform the user that the employee was added successfully
 
-# Function to update an existing employee's information
 # Function to update an existing employee's information
 def update_employee():
     id = input("Enter the ID of the employee to update: ")  # Prompt user for the ID of the employee to update
-    for emp in employees:
-        if emp.id == id:
-            if isinstance(emp, FullTimeEmployee):
-                salary = input("Enter new salary (leave blank to keep current): ")
-                if salary:
-                    emp.salary = Decimal(salary)  # Update salary if a new value is provided
-                benefits = input("Enter new benefits amount (leave blank to keep current): ")
-                if benefits:
-                    emp.benefits = Decimal(benefits)  # Update benefits if a new value is provided
-                tax_rate = input("Enter new tax rate (%) (leave blank to keep current): ")
-                if tax_rate:
-                    emp.tax_rate = Decimal(tax_rate)  # Update tax rate if a new value is provided
-            elif isinstance(emp, PartTimeEmployee):
-                hourly_rate = input("Enter new hourly rate (leave blank to keep current): ")
-                if hourly_rate:
-                    emp.hourly_rate = Decimal(hourly_rate)  # Update hourly rate if a new value is provided
-                hours_worked = input("Enter new hours worked (leave blank to keep current): ")
-                if hours_worked:
-                    emp.hours_worked = Decimal(hours_worked)  # Update hours worked if a new value is provided
-                tax_rate = input("Enter new tax rate (%) (leave blank to keep current): ")
-                if tax_rate:
-                    emp.tax_rate = Decimal(tax_rate)  # Update tax rate if a new value is provided
-            
-            log_action("Updated", emp)  # Log the action of updating employee information
-            print("Employee information updated successfully!")  # Inform the user that the employee information was updated successfully
+    emp = employees.get(id)  # Look up the employee by ID in constant time
+    if emp is None:
+        print("Employee not found!")  # Inform the user if the employee was not found
+        return
+
+    changes = {}
+    if isinstance(emp, FullTimeEmployee):
+        changes["salary"] = input("Enter new salary (leave blank to keep current): ")
+        changes["benefits"] = input("Enter new benefits amount (leave blank to keep current): ")
+        changes["tax_rate"] = input("Enter new tax rate (%) (leave blank to keep current): ")
+    elif isinstance(emp, PartTimeEmployee):
+        changes["hourly_rate"] = input("Enter new hourly rate (leave blank to keep current): ")
+        changes["hours_worked"] = input("Enter new hours worked (leave blank to keep current): ")
+        changes["tax_rate"] = input("Enter new tax rate (%) (leave blank to keep current): ")
+    employees.update(id, **changes)  # Blank values are ignored by update_details
+
+    log_action("Updated", emp)  # Log the action of updating employee information
+    print("Employee information updated successfully!")  # Inform the user that the employee information was updated successfully
+
+
+SEPARATOR = "-----------------------------\n"  # Separator line printed between records
+
+# Function to order IDs numerically when they are all digits, otherwise as text
+def id_sort_key(id):
+    id = EmployeeRegistry.normalize_id(id)
+    return (0, int(id)) if id.isdigit() else (1, id)  # Only the number counts, so "500" and "0500" both fall inside 0001-0500
+
+# Function to split the selected employees into formatted pages of text
+def employee_pages(role=None, id_range=None, page_size=20):
+    selected = iter(employees) if role is None else iter(employees.by_role(role))  # Use the role index instead of rescanning
+    if id_range is not None:
+        low, high = (id_sort_key(id) for id in id_range)
+        selected = (emp for emp in selected if low <= id_sort_key(emp.id) <= high)  # Keep IDs inside the inclusive range
+    while True:
+        page = list(islice(selected, page_size))  # Only format the employees on this page
+        if not page:
+            break
+        yield "".join(SEPARATOR + emp.get_employee_details() + "\n" + emp.pay_text() for emp in page)
+
+# Function to display current employees one page at a time
+def display_employees(role=None, id_range=None, page_size=20, out=None):
+    out = sys.stdout if out is None else out
+    pages = employee_pages(role, id_range, page_size)
+    page = next(pages, None)
+    if page is None:
+        print("No current employees.")  # Inform the user if there are no matching employees
+        return
+    while page is not None:
+        out.write(page)  # One write per page
+        out.flush()
+        page = next(pages, None)
+        if page is not None and input("Press Enter for the next page or 'q' to stop: ").lower() == "q":
+            break
+
+# Function to ask for display filters and show matching employees page by page
+def display_menu():
+    role = input("Filter by role (leave blank for all): ").strip() or None  # Prompt user for an optional role filter
+    id_range = input("Filter by ID range, e.g. 0001-0500 (leave blank for all): ").strip()  # Prompt user for an optional ID range
+    if id_range:
+        if id_range.count("-") != 1:
+            print("Invalid ID range!")  # Handle an invalid range
             return
-    print("Employee not found!")  # Inform the user if the employee was not found
+        id_range = tuple(id_range.split("-"))
+    display_employees(role, id_range or None)
 
+# Columns used by bulk import and export
+PAY_FIELDS = {"full-time": ("salary", "benefits", "tax_rate"), "part-time": ("hourly_rate", "hours_worked", "tax_rate")}
+EXPORT_FIELDS = ("role", "name", "id", "salary", "benefits", "hourly_rate", "hours_worked", "tax_rate", "gross_pay", "net_pay")
 
-# Function to display current employees
-def display_employees():
-    if not employees:
-        print("No current employees.")  # Inform the user if there are no current employees
+# Function to pick the file format from an explicit choice or the file extension
+def file_format(path, fmt=None):
+    fmt = (fmt or os.path.splitext(path)[1].lstrip(".") or "csv").lower()
+    if fmt == "json":
+        fmt = "jsonl"
+    if fmt not in ("csv", "jsonl"):
+        raise ValueError(f"Unsupported format: {fmt}")
+    return fmt
+
+# Function to build an employee from one imported record
+def employee_from_record(record):
+    role = str(record.get("role") or "").strip()
+    name = str(record.get("name") or "").strip()
+    id = str(record.get("id") or "").strip()
+    if not name or not id:
+        raise ValueError("name and id are required")
+    fields = PAY_FIELDS.get(role.lower())
+    if fields is None:
+        raise ValueError(f"invalid role {role!r}")
+    values = []
+    for field in fields:
+        text = record.get(field)
+        try:
+            values.append(parse_decimal(str(text)))  # Same validation rules as the interactive prompts
+        except InvalidOperation:
+            raise ValueError(f"invalid {field} {text!r}") from None
+    cls = FullTimeEmployee if role.lower() == "full-time" else PartTimeEmployee
+    return cls(role, name, id, *values)
+
+# Function to read records one at a time as (line number, record) pairs
+def read_records(import_file, fmt):
+    if fmt == "csv":
+        reader = csv.DictReader(import_file)
+        for record in reader:
+            yield reader.line_num, record
     else:
-        for emp in employees:
-            print("-----------------------------")  # Print a separator line
-            print(emp.get_employee_details())  # Print employee details
-            if isinstance(emp, FullTimeEmployee):
-                print(emp.get_salary())  # Print salary details for full-time employees
-                print(emp.calculate_weekly_pay())  # Print weekly pay details for full-time employees
-            elif isinstance(emp, PartTimeEmployee):
-                print(emp.calculate_pay())  # Print pay details for part-time employees
+        for line_num, line in enumerate(import_file, 1):
+            if line.strip():
+                try:
+                    record = json.loads(line, parse_float=str, parse_int=str)  # Keep numbers as text for exact Decimals
+                except ValueError:
+                    record = None
+                yield line_num, record
+
+# Function to import employees from a CSV or JSONL file in chunks
+def import_employees(path, registry=None, fmt=None, chunk_size=1000, errors=sys.stderr):
+    registry = employees if registry is None else registry
+    imported = rejected = 0
+    with open(path, newline="") as import_file:
+        records = read_records(import_file, file_format(path, fmt))
+        while True:
+            chunk = list(islice(records, chunk_size))  # Only one chunk of the file is held in memory
+            if not chunk:
+                break
+            batch, seen = [], set()
+            for line_num, record in chunk:
+                try:
+                    if not isinstance(record, dict):
+                        raise ValueError("not a valid record")
+                    emp = employee_from_record(record)
+                    key = EmployeeRegistry.normalize_id(emp.id)
+                    if key in seen or key in registry:
+                        raise ValueError(f"employee ID {key} already exists")
+                except ValueError as e:
+                    rejected += 1
+                    print(f"Line {line_num}: {e}", file=errors)  # Report the bad row and keep going
+                    continue
+                seen.add(key)
+                batch.append(emp)
+            registry.add_many(batch)
+            for emp in batch:
+                log_action("Added", emp)  # Log the action of adding each new employee
+            imported += len(batch)
+    return {"imported": imported, "rejected": rejected}
+
+# Function to export the roster and computed pay to a CSV or JSONL file in chunks
+def export_employees(path, registry=None, fmt=None, chunk_size=1000):
+    registry = employees if registry is None else registry
+    fmt = file_format(path, fmt)
+    exported = 0
+    roster = registry.stream()
+    with open(path, "w", newline="") as export_file:
+        if fmt == "csv":
+            writer = csv.writer(export_file)
+            writer.writerow(EXPORT_FIELDS)
+        while True:
+            chunk = list(islice(roster, chunk_size))  # Only one chunk of the roster is held in memory
+            if not chunk:
+                break
+            pay = run_payroll(chunk)
+            pay = dict(zip(pay["id"], zip(pay["gross"], pay["net"])))
+            for emp in chunk:
+                gross, net = pay.get(emp.id, (None, None))
+                row = [getattr(emp, field, None) for field in EXPORT_FIELDS[:-2]] + [gross, net]
+                row = [None if value is None else str(value) for value in row]
+                if fmt == "csv":
+                    writer.writerow(["" if value is None else value for value in row])
+                else:
+                    export_file.write(json.dumps({k: v for k, v in zip(EXPORT_FIELDS, row) if v is not None}) + "\n")
+            exported += len(chunk)
+    return exported
+
+# Function to print the audit log entries for one employee, optionally within a time range
+def show_history(id, start=None, end=None):
+    try:
+        end_of_day = end is not None and len(end.strip()) == 10  # A bare YYYY-MM-DD end date includes that whole day
+        start, end = (None if value is None else datetime.datetime.fromisoformat(value.strip()) for value in (start, end))
+    except ValueError:
+        print("Invalid date! Use YYYY-MM-DD or YYYY-MM-DD HH:MM:SS.", file=sys.stderr)
+        return 2
+    if end_of_day:
+        end = end.replace(hour=23, minute=59, second=59, microsecond=999999)
+    audit_log.flush()  # Make sure queued lines are on file before reading it
+    index = LogIndex(audit_log.path)
+    try:
+        found = 0
+        for entry in index.query(id, start, end):
+            print(f"{entry['timestamp']} - {entry['action']} - Role: {entry['role']}, Name: {entry['name']}, ID: {entry['id']}")
+            found += 1
+    finally:
+        index.close()
+    if not found:
+        print("No history found.")
+    return 0
+
+# Asyncio service exposing the roster as newline-delimited JSON requests over a local socket
+class EmployeeService:
+    def __init__(self, registry=None, host="127.0.0.1", port=8765):
+        self.registry = employees if registry is None else registry
+        self.host = host
+        self.port = port
+        self.server = None
+        self._locks = weakref.WeakValueDictionary()  # Normalized ID -> asyncio.Lock, dropped once no request holds it
+        self._registry_thread = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="registry")  # Registry and store calls run here, one at a time, off the event loop
+        self._handlers = {"add": self._add, "update": self._update, "get": self._get, "list": self._list, "pay": self._pay}
+
+    async def start(self):
+        self.server = await asyncio.start_server(self._serve_client, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]  # Actual port when 0 was requested
+        return self
+
+    async def close(self):
+        self.server.close()
+        await self.server.wait_closed()
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self._registry_thread.shutdown)  # Both calls block; keep them off the event loop
+        await loop.run_in_executor(None, audit_log.flush)
+
+    def _lock(self, id):
+        key = EmployeeRegistry.normalize_id(id)
+        lock = self._locks.get(key)
+        if lock is None:
+            lock = self._locks[key] = asyncio.Lock()
+        return lock
+
+    async def _call(self, func, *args, **kwargs):
+        return await asyncio.get_running_loop().run_in_executor(self._registry_thread, lambda: func(*args, **kwargs))
+
+    async def _serve_client(self, reader, writer):
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    writer.write(b'{"ok": false, "error": "request line too long"}\n')  # The stream cannot be resynchronized
+                    await writer.drain()
+                    break
+                if not line:
+                    break
+                writer.write(json.dumps(await self.handle(line)).encode() + b"\n")
+                await writer.drain()
+        except ConnectionError:
+            pass  # The client went away
+        finally:
+            writer.close()
+
+    async def handle(self, line):
+        try:
+            request = json.loads(line)
+            handler = self._handlers.get(request.get("op")) if isinstance(request, dict) else None
+            if handler is None:
+                raise ValueError(f"unknown op; expected one of {sorted(self._handlers)}")
+            return {"ok": True, "result": await handler(request)}
+        except KeyError as e:
+            return {"ok": False, "error": str(e.args[0]) if e.args else "KeyError"}
+        except ArithmeticError as e:  # decimal.InvalidOperation and friends have unreadable messages
+            return {"ok": False, "error": f"invalid amount ({type(e).__name__})"}
+        except Exception as e:  # Any failed request gets a reply; only connection errors end the session
+            return {"ok": False, "error": str(e) or type(e).__name__}
+
+    @staticmethod
+    def employee_record(emp):
+        row = EmployeeStore.to_row(emp)
+        return {column: value for column, value in zip(EmployeeStore.COLUMNS, row) if value is not None}
+
+    async def _get_employee(self, request):
+        emp = await self._call(self.registry.get, str(request.get("id", "")))
+        if emp is None:
+            raise KeyError("employee not found")
+        return emp
+
+    async def _add(self, request):
+        emp = employee_from_record(request.get("employee") or {})  # Same validation as bulk import
+        async with self._lock(emp.id):
+            await self._call(self.registry.add, emp)  # Raises ValueError for a duplicate ID
+            log_action("Added", emp)  # Only queues the line; the writer thread does the I/O
+            return self.employee_record(emp)
+
+    async def _update(self, request):
+        async with self._lock(str(request.get("id", ""))):  # Serialize updates to the same employee
+            emp = await self._get_employee(request)
+            fields = PAY_FIELDS.get(emp.role.lower(), ())
+            changes = {}
+            for field, value in (request.get("changes") or {}).items():
+                if field not in fields:
+                    raise ValueError(f"cannot update {field!r}")
+                try:
+                    changes[field] = str(parse_decimal(str(value)))  # Same validation rules as the prompts
+                except InvalidOperation:
+                    raise ValueError(f"invalid {field} {value!r}") from None
+            await self._call(self.registry.update, emp.id, **changes)
+            log_action("Updated", emp)
+            return self.employee_record(emp)
+
+    async def _get(self, request):
+        id = str(request.get("id", ""))
+
+        def record():
+            emp = self.registry.get(id)
+            return None if emp is None else self.employee_record(emp)  # Read on the registry thread, where updates are applied
+
+        result = await self._call(record)
+        if result is None:
+            raise KeyError("employee not found")
+        return result
+
+    async def _list(self, request):
+        role, offset, limit = request.get("role"), int(request.get("offset", 0)), min(int(request.get("limit", 100)), 1000)
+
+        def page():
+            selected = iter(self.registry) if role is None else iter(self.registry.by_role(role))
+            return [self.employee_record(emp) for emp in islice(selected, offset, offset + limit)]
+
+        return await self._call(page)
+
+    async def _pay(self, request):
+        emp = await self._get_employee(request)
+        pay = await self._call(run_payroll, [emp])
+        if not pay["id"]:
+            raise ValueError("employee has no pay details")
+        return {"id": emp.id, "gross": str(pay["gross"][0]), "net": str(pay["net"][0])}
+
+# Function to run the service until interrupted
+def serve(address="127.0.0.1:8765"):
+    host, _, port = address.rpartition(":")
+
+    async def main():
+        service = await EmployeeService(host=host or "127.0.0.1", port=int(port)).start()
+        print(f"Serving employees on {service.host}:{service.port} (Ctrl+C to stop)")
+        try:
+            await service.server.serve_forever()
+        finally:
+            await service.close()
+
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        print("Service stopped.")
+    return 0
+
+# Function to run a non-interactive command such as "import staff.csv" or "export roster.jsonl"
+def run_command(args):
+    if args[:1] == ["history"] and 2 <= len(args) <= 4:
+        return show_history(*args[1:])
+    if args[:1] == ["serve"] and len(args) <= 2:
+        return serve(*args[1:])
+    if len(args) != 2 or args[0] not in ("import", "export"):
+        print("Usage: empman.py [import|export] <file.csv|file.jsonl>", file=sys.stderr)
+        print("       empman.py history <id> [from] [to]", file=sys.stderr)
+        print("       empman.py serve [host:port]", file=sys.stderr)
+        return 2
+    command, path = args
+    if command == "import":
+        result = import_employees(path)
+        print(f"Imported {result['imported']} employees, rejected {result['rejected']} rows.")
+        return 1 if result["rejected"] else 0
+    print(f"Exported {export_employees(path)} employees.")
+    return 0
 
 # Main menu function
 def main_menu():
@@ -155,7 +1135,7 @@ def main_menu():
             update_employee()  # Call the update_employee function
         elif choice.lower() == 'display':
             print("-----------------------------")  # Print a separator line
-            display_employees()  # Call the display_employees function
+            display_menu()  # Call the display_menu function
         elif choice.lower() == 'exit':
             print("-----------------------------")  # Print a separator line
             print("Exiting program. Goodbye!")  # Inform the user that the program is exiting
@@ -164,4 +1144,8 @@ def main_menu():
             print("Invalid choice!")  # Handle invalid menu choice input
 
 # Start the menu
-main_menu()  # Call the main_menu function to start the program
+if __name__ == "__main__":
+    employees = EmployeeRegistry(EmployeeStore("employees.db"))  # Load the saved roster lazily from disk
+    if len(sys.argv) > 1:
+        sys.exit(run_command(sys.argv[1:]))  # Run a bulk command without the interactive menu
+    main_menu()  # Call the main_menu function to start the program
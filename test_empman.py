@@ -0,0 +1,403 @@
+import asyncio  # Import the asyncio module to drive the service
+import contextlib  # Import the contextlib module to capture printed output
+import datetime  # Import the datetime module for history bounds
+import io  # Import the io module for in-memory output
+import json  # Import the json module to encode service requests
+import os  # Import the os module for file paths
+import random  # Import the random module to generate rosters
+import tempfile  # Import the tempfile module for scratch directories
+import unittest  # Import the unittest module
+from decimal import Decimal  # Import the Decimal class from the decimal module
+
+import empman  # Import the employee management program
+
+# Function to return the (gross, net) pay text the per-object methods show, rounded to cents
+def per_object_pay(emp):
+    if isinstance(emp, empman.FullTimeEmployee):
+        gross, net = emp.calculate_weekly_pay().removeprefix("Weekly Gross Pay: ").split(", Weekly Net Pay: ")
+        return gross, net
+    gross, _ = emp.pay_amounts()  # calculate_pay shows part-time gross unrounded
+    return f"{gross:,.2f}", emp.calculate_pay().split("Net Pay: ")[1]
+
+class RunPayrollTest(unittest.TestCase):
+    def assertPennyIdentical(self, roster):
+        columns = empman.run_payroll(roster)
+        self.assertEqual(columns["id"], [emp.id for emp in roster])
+        for emp, gross, net in zip(roster, columns["gross"], columns["net"]):
+            self.assertEqual((f"{gross:,.2f}", f"{net:,.2f}"), per_object_pay(emp), f"ID {emp.id}")
+
+    def test_random_roster(self):
+        rng = random.Random(0)
+        roster = []
+        for i in range(2000):
+            tax_rate = Decimal(rng.randint(0, 5000)) / 100
+            if i % 2:
+                roster.append(empman.FullTimeEmployee("full-time", "F", str(i), Decimal(rng.randint(0, 30000000)) / 100, Decimal(rng.randint(0, 50000)) / 100, tax_rate))
+            else:
+                roster.append(empman.PartTimeEmployee("part-time", "P", str(i), Decimal(rng.randint(0, 10000)) / 100, Decimal(rng.randint(0, 600)) / 10, tax_rate))
+        self.assertPennyIdentical(roster)
+
+    def test_half_cent_ties(self):
+        roster = [
+            empman.FullTimeEmployee("full-time", "A", "1", "52.26", "0", "0"),    # Gross exactly 1.005
+            empman.FullTimeEmployee("full-time", "B", "2", "52.78", "0", "0"),    # Gross exactly 1.015
+            empman.FullTimeEmployee("full-time", "C", "3", "520", "0", "0.05"),   # Net exactly 9.995
+            empman.PartTimeEmployee("part-time", "D", "4", "0.5", "2.01", "0"),   # Gross exactly 1.005
+            empman.PartTimeEmployee("part-time", "E", "5", "0.5", "2.05", "0"),   # Gross exactly 1.025
+            empman.PartTimeEmployee("part-time", "F", "6", "10", "1", "0.15"),    # Net exactly 9.985
+        ]
+        columns = empman.run_payroll(roster)
+        self.assertEqual(columns["gross"][:2], [Decimal("1.00"), Decimal("1.02")])  # Ties round to even
+        self.assertEqual(columns["net"][2], Decimal("10.00"))
+        self.assertPennyIdentical(roster)
+
+    def test_infinite_and_large_amounts(self):
+        roster = [
+            empman.FullTimeEmployee("full-time", "A", "1", "Infinity", "0", "10"),
+            empman.FullTimeEmployee("full-time", "B", "2", "1e30", "0", "10"),
+            empman.PartTimeEmployee("part-time", "C", "3", "1e40", "3", "10"),
+        ]
+        self.assertPennyIdentical(roster)
+
+class AuditLogTest(unittest.TestCase):
+    def setUp(self):
+        self.emp = empman.FullTimeEmployee("full-time", "Ann", "0042", "52000", "10", "20")
+
+    def test_lines_round_trip(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            log = empman.AuditLog(os.path.join(tmp, "log.txt"))
+            log.write("Added", self.emp)
+            log.close()
+            entry, = empman.read_log(log.path)
+            self.assertEqual((entry["action"], entry["id"], entry["name"]), ("Added", "0042", "Ann"))
+
+    def test_writer_failure_is_raised(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            log = empman.AuditLog(os.path.join(tmp, "missing", "log.txt"))
+            log.write("Added", self.emp)
+            with self.assertRaises(OSError):
+                log.flush(timeout=5)  # Must not hang once the writer has died
+            with self.assertRaises(OSError):
+                log.write("Updated", self.emp)
+            with self.assertRaises(OSError):
+                log.close(timeout=5)
+
+class ProjectPayrollTest(unittest.TestCase):
+    def setUp(self):
+        self.roster = [empman.PartTimeEmployee("part-time", "P", str(i), "20", "30", "10") for i in range(20)]
+
+    def test_wide_hours_spread_clamps_at_zero(self):
+        results = empman.project_payroll(self.roster, [empman.Scenario("s", hours_spread=2, seed=1)], periods=8, workers=1)
+        self.assertTrue(all(gross >= 0 for gross, _ in results["s"]["part-time"]))
+
+    def test_negative_hours_spread_is_rejected(self):
+        with self.assertRaises(ValueError):
+            empman.Scenario("s", hours_spread=-1)
+
+    def test_results_do_not_depend_on_sharding(self):
+        scenarios = [empman.Scenario("s", raise_pct=3, raise_period=4, hours_spread="0.3", seed=5)]
+        one = empman.project_payroll(self.roster, scenarios, periods=8, workers=1, shard_size=20)
+        many = empman.project_payroll(self.roster, scenarios, periods=8, workers=1, shard_size=3)
+        self.assertEqual(one, many)
+
+class EmployeeServiceTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.saved_log, empman.audit_log = empman.audit_log, empman.AuditLog(os.path.join(self.tmp.name, "log.txt"))
+        self.store = empman.EmployeeStore(os.path.join(self.tmp.name, "employees.db"))
+        self.service = empman.EmployeeService(empman.EmployeeRegistry(self.store))
+
+    def tearDown(self):
+        empman.audit_log.close()
+        empman.audit_log = self.saved_log
+        self.service._registry_thread.shutdown()
+        self.tmp.cleanup()
+
+    def request(self, **request):
+        return asyncio.run(self.service.handle(json.dumps(request)))
+
+    def test_failed_requests_get_replies(self):
+        employee = {"role": "full-time", "name": "Ann", "id": "1", "salary": "Infinity", "benefits": "Infinity", "tax_rate": "10"}
+        self.assertFalse(self.request(op="add", employee=employee)["ok"])  # Non-finite amounts are rejected
+        self.service.registry.add(empman.employee_from_record(dict(employee, salary="52000", benefits="10")))
+        self.service.registry.get("1").update_details(salary=Decimal("Infinity"), benefits=Decimal("Infinity"))
+        self.assertFalse(self.request(op="pay", id="1")["ok"])  # Infinity - Infinity is an invalid decimal operation
+        self.assertFalse(self.request(op="update", id="1", changes={"tax_rate": "sNaN"})["ok"])
+        self.store.close()
+        self.assertFalse(self.request(op="update", id="1", changes={"tax_rate": "20"})["ok"])  # sqlite3 error
+
+    def test_blank_change_is_rejected(self):
+        employee = {"role": "full-time", "name": "Ann", "id": "1", "salary": "52000", "benefits": "10", "tax_rate": "20"}
+        self.request(op="add", employee=employee)
+        self.assertFalse(self.request(op="update", id="1", changes={"benefits": ""})["ok"])
+        self.assertEqual(self.request(op="get", id="1")["result"]["benefits"], "10")
+
+class EmployeeRegistryTest(unittest.TestCase):
+    def setUp(self):
+        self.registry = empman.EmployeeRegistry()
+        self.ann = self.registry.add(empman.FullTimeEmployee("full-time", "Ann", "0042", "52000", "10", "20"))
+        self.bob = self.registry.add(empman.PartTimeEmployee("part-time", "Bob", "7", "20", "10", "15"))
+
+    def test_duplicate_ids_are_rejected(self):
+        with self.assertRaises(ValueError):
+            self.registry.add(empman.PartTimeEmployee("part-time", "Cy", " 0042 ", "20", "10", "15"))
+        with self.assertRaises(ValueError):
+            self.registry.add_many([empman.PartTimeEmployee("part-time", "Cy", "8", "20", "10", "15"),
+                                    empman.PartTimeEmployee("part-time", "Di", "8 ", "20", "10", "15")])
+        with self.assertRaises(ValueError):
+            self.registry.add_many([empman.PartTimeEmployee("part-time", "Cy", "8", "20", "10", "15"),
+                                    empman.PartTimeEmployee("part-time", "Di", "\t7", "20", "10", "15")])
+        self.assertEqual(len(self.registry), 2)  # A rejected batch adds nobody
+        self.assertNotIn("8", self.registry)
+        self.assertIs(self.registry.get("0042"), self.ann)
+
+    def test_remove_cleans_up_indexes(self):
+        self.assertIs(self.registry.remove(" 7 "), self.bob)
+        self.assertNotIn("7", self.registry)
+        self.assertEqual(self.registry.by_role("part-time"), [])
+        self.assertEqual(self.registry.by_name("bob"), [])
+        self.assertNotIn("part-time", self.registry._by_role)  # Empty buckets are deleted
+        self.assertNotIn("bob", self.registry._by_name)
+        self.assertEqual(self.registry.by_role("FULL-TIME"), [self.ann])
+
+    def test_unknown_ids_raise_key_error(self):
+        with self.assertRaises(KeyError):
+            self.registry.update("42", tax_rate="25")  # Leading zeros are significant
+        with self.assertRaises(KeyError):
+            self.registry.remove("99")
+        self.assertEqual(len(self.registry), 2)
+
+class EmployeeStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "employees.db")
+        store = empman.EmployeeStore(self.path)
+        registry = empman.EmployeeRegistry(store)
+        registry.add_many([empman.FullTimeEmployee("full-time", "Ann", "0001", "52000.10", "10.005", "12.345678901234567890123"),
+                           empman.PartTimeEmployee("part-time", "Bob", "2", "25.50", "37.25", "12.5"),
+                           empman.PartTimeEmployee("part-time", "Cy", "3", "20", "10", "15")])
+        store.close()
+        self.store = empman.EmployeeStore(self.path)  # Reopen so the registry starts with nothing in memory
+        self.registry = empman.EmployeeRegistry(self.store)
+
+    def tearDown(self):
+        self.store.close()
+        self.tmp.cleanup()
+
+    def test_rows_round_trip_decimals_exactly(self):
+        emp = empman.FullTimeEmployee("full-time", "Ann", " 0001 ", Decimal("52000.10"), Decimal("1E+2"), Decimal("12.345678901234567890123"))
+        row = empman.EmployeeStore.to_row(emp)
+        self.assertEqual(row[0], "0001")
+        copy = empman.EmployeeStore.from_row(row)
+        self.assertEqual([str(getattr(copy, field)) for field in ("salary", "benefits", "tax_rate")], ["52000.10", "1E+2", "12.345678901234567890123"])
+        self.assertEqual(str(self.registry.get("2").hours_worked), "37.25")
+
+    def test_lookups_do_not_load_the_roster(self):
+        self.assertEqual(len(self.registry), 3)
+        self.assertIn(" 0001", self.registry)
+        self.assertNotIn("1", self.registry)  # Leading zeros are significant
+        self.assertEqual(self.registry.get("2").name, "Bob")
+        self.assertFalse(self.registry._loaded)
+        self.assertEqual(len(self.registry._by_id), 2)  # Only the employees fetched are cached
+
+    def test_load_keeps_fetched_employees(self):
+        bob = self.registry.get("2")
+        self.assertEqual([emp.id for emp in self.registry], ["0001", "2", "3"])  # Loads the roster in insertion order
+        self.assertTrue(self.registry._loaded)
+        self.assertIs(self.registry.get("2"), bob)
+        self.assertIn(bob, self.registry.by_role("part-time"))
+
+    def test_changes_write_a_single_row(self):
+        statements = []
+        self.store.conn.set_trace_callback(statements.append)
+        for change in (lambda: self.registry.update("2", hours_worked="40"), lambda: self.registry.remove("3")):
+            statements.clear()
+            before = self.store.conn.total_changes
+            change()
+            self.assertEqual(self.store.conn.total_changes - before, 1)
+            self.assertEqual(len([sql for sql in statements if sql.startswith(("INSERT", "UPDATE", "DELETE"))]), 1)
+        self.assertFalse(self.registry._loaded)
+        self.assertEqual((self.store.count(), str(self.store.get("2").hours_worked)), (2, "40"))
+
+class DisplayTest(unittest.TestCase):
+    def setUp(self):
+        self.saved, empman.employees = empman.employees, empman.EmployeeRegistry()
+        for id in ("0001", "500", "0500", "0501", "7", "A12"):
+            empman.employees.add(empman.PartTimeEmployee("part-time", "Ann", id, "20", "10", "15"))
+
+    def tearDown(self):
+        empman.employees = self.saved
+
+    def ids(self, pages):
+        return [line.rsplit("ID: ", 1)[1] for page in pages for line in page.splitlines() if "ID: " in line]
+
+    def test_id_range_compares_numbers(self):
+        self.assertEqual(self.ids(empman.employee_pages(id_range=("0001", "0500"))), ["0001", "500", "0500", "7"])
+        self.assertEqual(self.ids(empman.employee_pages(id_range=("501", "501"))), ["0501"])
+
+    def test_pages_are_split_by_page_size(self):
+        pages = list(empman.employee_pages(page_size=4))
+        self.assertEqual([page.count(empman.SEPARATOR) for page in pages], [4, 2])
+        self.assertEqual(self.ids(pages), ["0001", "500", "0500", "0501", "7", "A12"])
+
+    def test_updates_refresh_pay_text(self):
+        emp = empman.employees.get("7")
+        self.assertIn("Gross Pay: 200", emp.pay_text())
+        emp.update_details(hours_worked="20")
+        self.assertIn("Gross Pay: 400", emp.pay_text())
+        empman.employees.update("7", hourly_rate="30")
+        self.assertIn("Gross Pay: 600", emp.pay_text())
+        self.assertIn("Gross Pay: 600", "".join(empman.employee_pages(id_range=("7", "7"))))
+
+class ImportExportTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.saved_log, empman.audit_log = empman.audit_log, empman.AuditLog(os.path.join(self.tmp.name, "log.txt"))
+        self.registry = empman.EmployeeRegistry()
+
+    def tearDown(self):
+        empman.audit_log.close()
+        empman.audit_log = self.saved_log
+        self.tmp.cleanup()
+
+    def write(self, name, text):
+        path = os.path.join(self.tmp.name, name)
+        with open(path, "w", newline="") as data_file:
+            data_file.write(text)
+        return path
+
+    def import_file(self, path, **kw):
+        errors = io.StringIO()
+        result = empman.import_employees(path, self.registry, errors=errors, **kw)
+        return result, errors.getvalue().splitlines()
+
+    def test_bad_rows_are_reported_and_skipped(self):
+        path = self.write("staff.csv", "role,name,id,salary,benefits,tax_rate,hourly_rate,hours_worked\n"
+                          "full-time,Ann,1,52000,10,20,,\n"
+                          "full-time,Bob,2,lots,10,20,,\n"
+                          "full-time,Cy,3,,10,20,,\n"
+                          "part-time,Di,4,,,15,25.50,Infinity\n"
+                          "part-time,Ed,5,,,15,25.50,40\n")
+        result, errors = self.import_file(path)
+        self.assertEqual(result, {"imported": 2, "rejected": 3})
+        self.assertEqual([line.split(":")[0] for line in errors], ["Line 3", "Line 4", "Line 5"])  # Blank and non-finite pay fields too
+        self.assertEqual(sorted(emp.id for emp in self.registry), ["1", "5"])
+
+    def test_duplicate_id_in_one_chunk_is_rejected(self):
+        path = self.write("staff.jsonl", '{"role": "full-time", "name": "Ann", "id": "7", "salary": 52000, "benefits": 10, "tax_rate": 20}\n'
+                          '{"role": "part-time", "name": "Bob", "id": " 7 ", "hourly_rate": 20, "hours_worked": 10, "tax_rate": 15}\n')
+        result, errors = self.import_file(path)
+        self.assertEqual(result, {"imported": 1, "rejected": 1})
+        self.assertIn("Line 2", errors[0])
+        self.assertEqual(self.registry.get("7").name, "Ann")
+
+    def test_jsonl_numbers_keep_their_digits(self):
+        path = self.write("staff.jsonl", '{"role": "full-time", "name": "Ann", "id": "1", "salary": 52000.10, "benefits": 10.00, "tax_rate": 12.345678901234567890123}\n')
+        self.import_file(path)
+        emp = self.registry.get("1")
+        self.assertEqual((str(emp.salary), str(emp.benefits), str(emp.tax_rate)), ("52000.10", "10.00", "12.345678901234567890123"))
+
+    def test_export_import_round_trip(self):
+        self.registry.add(empman.FullTimeEmployee("full-time", "Ann", "0001", "52000.10", "10.005", "20"))
+        self.registry.add(empman.PartTimeEmployee("part-time", "Bob", "2", "25.50", "37.25", "12.5"))
+        pay = empman.run_payroll(list(self.registry))
+        for name in ("roster.csv", "roster.jsonl"):
+            path = os.path.join(self.tmp.name, name)
+            self.assertEqual(empman.export_employees(path, self.registry, chunk_size=1), 2)
+            with open(path, newline="") as export_file:
+                records = [record for _, record in empman.read_records(export_file, empman.file_format(path))]
+            self.assertEqual([(record["gross_pay"], record["net_pay"]) for record in records],
+                             [(str(gross), str(net)) for gross, net in zip(pay["gross"], pay["net"])])
+            copy, self.registry = self.registry, empman.EmployeeRegistry()
+            self.assertEqual(self.import_file(path), ({"imported": 2, "rejected": 0}, []))
+            for old, new in zip(copy, self.registry):
+                self.assertEqual([str(getattr(old, field, None)) for field in empman.EXPORT_FIELDS[:-2]],
+                                 [str(getattr(new, field, None)) for field in empman.EXPORT_FIELDS[:-2]])
+            self.registry = copy
+
+class LogIndexTest(unittest.TestCase):
+    def test_writer_keeps_index_current(self):
+        emp = empman.FullTimeEmployee("full-time", "Ann", "0042", "52000", "10", "20")
+        with tempfile.TemporaryDirectory() as tmp:
+            log = empman.AuditLog(os.path.join(tmp, "log.txt"), index=True)
+            for _ in range(50):
+                log.write("Updated", emp)
+            log.flush()
+            index = empman.LogIndex(log.path)
+            indexed = index.conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]  # Counted before any query refreshes
+            for _ in range(50):
+                log.write("Updated", emp)
+                entries = list(index.query("0042"))  # Queries race with the writer's own refreshes
+            log.close()
+            self.assertEqual(indexed, 50)
+            self.assertEqual(len(list(index.query("0042"))), 100)  # No line indexed twice
+            index.close()
+
+    def test_malformed_lines_are_skipped(self):
+        emp = empman.FullTimeEmployee("full-time", "Ann", "0042", "52000", "10", "20")
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "log.txt")
+            with open(path, "w") as log_file:
+                log_file.write("not a log line\n")
+                log_file.write("yesterday\tAdded\t0042\tfull-time\tAnn\n")
+            log = empman.AuditLog(path, index=True)
+            log.write("Added", emp)
+            log.flush()
+            log.write("Updated", emp)
+            log.close()  # Neither the writer nor its index refresh died on the bad lines
+            index = empman.LogIndex(path)
+            self.assertEqual([entry["action"] for entry in index.query("0042")], ["Added", "Updated"])
+            self.assertEqual(index.skipped, 0)  # Already indexed by the writer
+            index.close()
+            os.remove(path + ".idx")
+            index = empman.LogIndex(path)
+            self.assertEqual(len(list(index.query("0042"))), 2)
+            self.assertEqual(index.skipped, 2)
+            index.close()
+
+    def test_text_and_date_bounds_start_at_midnight(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "log.txt")
+            with open(path, "w") as log_file:
+                log_file.write("2025-02-02 23:59:59.999999\tAdded\t0042\tfull-time\tAnn\n")
+                log_file.write("2025-02-03 00:00:00\tUpdated\t0042\tfull-time\tAnn\n")
+                log_file.write("2025-02-03 09:30:00.500000\tUpdated\t0042\tfull-time\tAnn\n")
+            index = empman.LogIndex(path)
+            self.assertEqual(len(list(index.query("0042", start="2025-02-03"))), 2)
+            self.assertEqual(len(list(index.query("0042", start=datetime.date(2025, 2, 3)))), 2)
+            self.assertEqual(len(list(index.query("0042", end="2025-02-03"))), 2)  # A bare date is midnight, not the whole day
+            self.assertEqual(len(list(index.query("0042", start="2025-02-03T09:30:00.5"))), 1)
+            index.close()
+
+class HistoryTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        path = os.path.join(self.tmp.name, "employee_log.txt")
+        with open(path, "w") as log_file:
+            log_file.write("2025-02-03 01:18:49.256075 - Added - Role: full-time, Name: Jason, ID: 0065\n")
+            log_file.write("2025-02-03 01:18:59.581970 - Updated - Role: full-time, Name: Jason, ID: 0065\n")
+        self.saved_log, empman.audit_log = empman.audit_log, empman.AuditLog(path)
+
+    def tearDown(self):
+        empman.audit_log.close()
+        empman.audit_log = self.saved_log
+        self.tmp.cleanup()
+
+    def history(self, *args):
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            empman.show_history(*args)
+        return out.getvalue()
+
+    def test_date_only_end_includes_that_day(self):
+        self.assertEqual(self.history("0065", "2025-02-01", "2025-02-03").count("ID: 0065"), 2)
+
+    def test_end_with_time_is_exact(self):
+        self.assertEqual(self.history("0065", "2025-02-01", "2025-02-03 01:18:50").count("ID: 0065"), 1)
+
+    def test_missing_log_has_no_history(self):
+        os.remove(empman.audit_log.path)
+        self.assertEqual(self.history("0065"), "No history found.\n")
+
+if __name__ == "__main__":
+    unittest.main()